@@ -1,8 +1,13 @@
 import os
 import sys
 import subprocess
-import platform
+import venv
 import json
+import re
+import hashlib
+
+# 在导入时确定平台，避免调用 platform.system()
+_IS_WIN = sys.platform.startswith('win')
 
 def check_python_version():
     # 检查Python版本
@@ -11,15 +16,46 @@ def check_python_version():
         print(f"当前Python版本: {sys.version_info.major}.{sys.version_info.minor}")
         sys.exit(1)
 
+def robust_json_loads(json_str):
+    """
+    逐层尝试解析JSON配置，返回 (config, stage)
+
+    stage 表示成功解析所在的步骤，便于调试输入格式问题。
+    全部失败时抛出最后一次的 json.JSONDecodeError。
+    """
+    # 1. 清理编码：去掉BOM和无法解码的替换字符
+    json_str = json_str.encode('utf-8', 'ignore').decode('utf-8-sig').replace('\ufffd', '')
+    # 2. 去掉 ```json 代码块标记
+    json_str = re.sub(r'^```(?:json)?\s*|\s*```$', '', json_str.strip(), flags=re.M)
+
+    candidates = [('direct', json_str)]
+    # 3. 去掉多余的尾随逗号
+    candidates.append(('trailing_comma', re.sub(r',(\s*[}\]])', r'\1', candidates[-1][1])))
+    # 4. 最后才将单引号替换为双引号，避免破坏字符串中的撇号
+    candidates.append(('single_quote', candidates[-1][1].replace("'", '"')))
+
+    decoder = json.JSONDecoder()
+    error = None
+    for stage, candidate in candidates:
+        try:
+            return json.loads(candidate), stage
+        except json.JSONDecodeError as e:
+            error = e
+        # 整体解析失败时，从第一个 { 开始解码一个完整对象，忽略前后的说明文字
+        start = candidate.find('{')
+        if start >= 0:
+            try:
+                return decoder.raw_decode(candidate, start)[0], 'extract' if stage == 'direct' else stage
+            except json.JSONDecodeError:
+                pass
+    raise error
+
 def parse_input():
     # 从标准输入读取JSON字符串
     print("请输入JSON配置字符串:")
     
-    # 读取所有输入行并合并
-    json_lines = []
-    for line in sys.stdin:
-        json_lines.append(line)
-    json_str = ''.join(json_lines).strip()
+    # 一次性读取全部输入，解码时顺带去掉UTF-8 BOM
+    json_str = sys.stdin.buffer.read().decode('utf-8-sig', errors='replace').strip()
     
     try:
         # 检查输入是否为空
@@ -27,18 +63,10 @@ def parse_input():
             print("错误：输入为空，请提供有效的JSON配置")
             sys.exit(1)
             
-        # 尝试不同的编码方式解析JSON
-        try:
-            # 首先尝试直接解析
-            config = json.loads(json_str)
-        except json.JSONDecodeError:
-            try:
-                # 尝试处理UTF-8 BOM
-                config = json.loads(json_str.encode('utf-8').decode('utf-8-sig'))
-            except:
-                # 尝试修复常见的JSON格式问题
-                json_str = json_str.replace("'", '"')  # 将单引号替换为双引号
-                config = json.loads(json_str)
+        # 逐层尝试解析JSON
+        config, stage = robust_json_loads(json_str)
+        if stage != 'direct':
+            print(f"提示：输入不是标准JSON，已通过 {stage} 步骤修复解析")
         
         # 设置默认值
         args = {
@@ -73,23 +101,39 @@ def create_venv(args):
     # 检查是否已存在虚拟环境
     if not os.path.exists(venv_name):
         print(f"正在创建虚拟环境 {venv_name}...")
-        subprocess.check_call([sys.executable, '-m', 'venv', venv_name])
+        # 在当前进程内创建虚拟环境，POSIX下使用符号链接避免复制解释器
+        venv.EnvBuilder(with_pip=True, symlinks=(os.name != 'nt')).create(venv_name)
     
     # 根据操作系统确定Python解释器路径
-    if platform.system() == 'Windows':
+    if _IS_WIN:
         python_path = os.path.join(venv_name, 'Scripts', 'python.exe')
         pip_path = os.path.join(venv_name, 'Scripts', 'pip.exe')
     else:
         python_path = os.path.join(venv_name, 'bin', 'python')
         pip_path = os.path.join(venv_name, 'bin', 'pip')
 
-    # 安装必要的包
-    print("正在安装必要的包...")
     tsinghua_mirror = "https://pypi.tuna.tsinghua.edu.cn/simple"
-   
-    # 安装所有必需的包
-    for package in args['packages']:
-        subprocess.check_call([pip_path, 'install', package, '-i', tsinghua_mirror])
+
+    # 根据包列表、镜像和Python版本计算安装标记，与上次一致时跳过安装
+    stamp_path = os.path.join(venv_name, '.install_stamp')
+    stamp = hashlib.sha1(
+        repr((sorted(args['packages']), tsinghua_mirror, sys.version)).encode('utf-8')
+    ).hexdigest()
+    installed_stamp = None
+    if os.path.exists(stamp_path):
+        with open(stamp_path, 'r', encoding='utf-8') as f:
+            installed_stamp = f.read().strip()
+
+    if installed_stamp == stamp:
+        print("依赖包未变化，跳过安装")
+    else:
+        # 安装必要的包
+        print("正在安装必要的包...")
+        # 一次性安装所有必需的包，由pip统一解析依赖，避免每个包都重复启动pip
+        if args['packages']:
+            subprocess.check_call([pip_path, 'install', *args['packages'], '-i', tsinghua_mirror])
+        with open(stamp_path, 'w', encoding='utf-8') as f:
+            f.write(stamp)
 
     print("环境设置完成！")
     print(f"开始打包{args['main_file']}...")
@@ -4,6 +4,10 @@ import sys
 import venv
 from pathlib import Path
 
+# 在导入时确定平台及虚拟环境内解释器的相对路径
+_IS_WIN = sys.platform.startswith("win")
+_PY_EXE_REL = ("Scripts", "python.exe") if _IS_WIN else ("bin", "python")
+
 def create_venv(venv_path: str = ".venv"):
     """
     创建虚拟环境
@@ -12,17 +16,13 @@ def create_venv(venv_path: str = ".venv"):
         venv_path (str): 虚拟环境路径
     """
     print(f"正在创建虚拟环境在: {venv_path}")
-    venv.create(venv_path, with_pip=True)
+    venv.create(venv_path, with_pip=True, symlinks=(os.name != "nt"))
 
 def get_python_executable(venv_path: str = ".venv"):
     """
     获取虚拟环境中的Python可执行文件路径
     """
-    if sys.platform == "win32":
-        python_path = os.path.join(venv_path, "Scripts", "python.exe")
-    else:
-        python_path = os.path.join(venv_path, "bin", "python")
-    return python_path
+    return os.path.join(venv_path, *_PY_EXE_REL)
 
 def install_requirements(python_path: str):
     """
@@ -33,30 +33,30 @@ def install_requirements(python_path: str):
     ]
     
     print("正在安装依赖包...")
-    for package in requirements:
-        print(f"安装 {package}...")
-        subprocess.run([
-            python_path, 
-            "-m", 
-            "pip", 
-            "install", 
-            package,
-            "-i", 
-            "https://pypi.tuna.tsinghua.edu.cn/simple"
-        ])
+    print(f"安装 {' '.join(requirements)}...")
+    # 所有依赖包合并为一次pip调用，只需解析一次索引
+    subprocess.run([
+        python_path, 
+        "-m", 
+        "pip", 
+        "install", 
+        *requirements,
+        "-i", 
+        "https://pypi.tuna.tsinghua.edu.cn/simple"
+    ], check=True)
 
 def help():
     venv_path = ".venv"
     print("\n环境设置完成！")
     print("请按照以下步骤操作：")
-    if sys.platform == "win32":
+    if _IS_WIN:
         print(f"1. 运行: {venv_path}\\Scripts\\activate")
         print(f"2. 切换Python解释器: {venv_path}\\Scripts\\python.exe")
     else:
         print(f"1. 运行: source {venv_path}/bin/activate")
         print(f"2. 切换Python解释器: {venv_path}/bin/python")
     print("\n您也可以直接使用完整路径来运行Python:")
-    if sys.platform == "win32":
+    if _IS_WIN:
         print(f"    {venv_path}\\Scripts\\python.exe your_script.py")
     else:
         print(f"    {venv_path}/bin/python your_script.py")
@@ -2,12 +2,10 @@ from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 from mcp.shared.context import RequestContext
 import asyncio
-import platform
-import json  # 添加 json 模块导入
 
 # Create server parameters for stdio connection
 # server_params = StdioServerParameters(
-#     command="dist/mcp_server_memory" if platform.system() != "Windows" else "dist/mcp_server_memory.exe",  # 根据系统选择可执行文件
+#     command="dist/mcp_server_memory" if not sys.platform.startswith("win") else "dist/mcp_server_memory.exe",  # 根据系统选择可执行文件
 #     args=["--transport", "stdio"],  # 确保使用 stdio 传输模式
 #     env=None,  # 可选环境变量
 # )
@@ -24,7 +22,7 @@ async def handle_sampling_message(
 ) -> types.CreateMessageResult:
     # 这里可以根据message参数进行自定义处理
     # 客户端需要调用LLM处理
-    print(f"收到消息创建请求：{json.dumps(message.model_dump(), indent=2, ensure_ascii=False)}")
+    print(f"收到消息创建请求：{message.model_dump_json(indent=2)}")
     
     # 返回正确的CreateMessageResult类型
     return types.CreateMessageResult(
@@ -51,46 +49,52 @@ async def run():
                     await session.initialize()
                     print("会话初始化成功")
                     print("--------------------------------")
-                    # 列出资源
-                    resources = await session.list_resource_templates()
-                    # 使用 exclude_none=True 来排除空值，使用 by_alias=True 来使用字段别名
-                    print(f"资源: {json.dumps(resources.model_dump(exclude_none=True, by_alias=True), indent=2, ensure_ascii=False)}")
+                    # 以下请求互不依赖，并发发出，总耗时取决于最慢的一个
+                    resources, story, topic, tools, graph = await asyncio.gather(
+                        session.list_resource_templates(),
+                        session.read_resource("memory://short-story/all"),
+                        session.read_resource("memory://topic"),
+                        session.list_tools(),
+                        session.call_tool("read_graph", {}),
+                        return_exceptions=True,
+                    )
 
-                    print("--------------------------------")
-                    # 请求资源
-                    result = await session.read_resource("memory://short-story/all")
-                    # 格式化输出资源内容
-                    if result.contents:
-                        for content in result.contents:
-                            print(f"资源URI: {content.uri}")
-                            print(f"MIME类型: {content.mimeType}")
-                            print(f"内容: {content.text}")
+                    # 列出资源
+                    if isinstance(resources, Exception):
+                        print(f"获取资源模板失败: {resources}")
                     else:
-                        print("未找到资源内容")
+                        # 使用 exclude_none=True 来排除空值，使用 by_alias=True 来使用字段别名
+                        print(f"资源: {resources.model_dump_json(exclude_none=True, by_alias=True, indent=2)}")
+
                     print("--------------------------------")
-                    # 请求资源
-                    result = await session.read_resource("memory://topic")
                     # 格式化输出资源内容
-                    if result.contents:
-                        for content in result.contents:
-                            print(f"资源URI: {content.uri}")
-                            print(f"MIME类型: {content.mimeType}")
-                            print(f"内容: {content.text}")
-                    else:
-                        print("未找到资源内容")
-                    print("--------------------------------")
+                    for result in (story, topic):
+                        if isinstance(result, Exception):
+                            print(f"读取资源失败: {result}")
+                        elif result.contents:
+                            for content in result.contents:
+                                print(f"资源URI: {content.uri}")
+                                print(f"MIME类型: {content.mimeType}")
+                                print(f"内容: {content.text}")
+                        else:
+                            print("未找到资源内容")
+                        print("--------------------------------")
 
                     # 列出可用工具
-                    tools = await session.list_tools()
-                    # 修改工具序列化方式
-                    tools_dict = {"tools": [tool.model_dump(exclude_none=True, by_alias=True) for tool in tools.tools]}
-                    print(f"可用工具: {json.dumps(tools_dict, indent=2, ensure_ascii=False)}")
+                    if isinstance(tools, Exception):
+                        print(f"获取工具列表失败: {tools}")
+                    else:
+                        # 修改工具序列化方式
+                        # 直接由 pydantic 一次性输出 JSON，不再构建中间字典
+                        print(f"可用工具: {tools.model_dump_json(include={'tools'}, exclude_none=True, by_alias=True, indent=2)}")
                     print("--------------------------------")
                     # 调用工具
-                    result = await session.call_tool("read_graph", {})
-                    # 修改结果序列化方式
-                    result_dict = result.model_dump(exclude_none=True, by_alias=True) if hasattr(result, "model_dump") else result
-                    print("调用工具read_graph:", json.dumps(result_dict, indent=2, ensure_ascii=False))
+                    if isinstance(graph, Exception):
+                        print(f"调用工具read_graph失败: {graph}")
+                    else:
+                        # 修改结果序列化方式
+                        result_json = graph.model_dump_json(exclude_none=True, by_alias=True, indent=2)
+                        print("调用工具read_graph:", result_json)
                     print("--------------------------------")
                     
                 except Exception as e:
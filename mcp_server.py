@@ -1,20 +1,102 @@
+import asyncio
+import time
+
 import anyio
 import click
 import httpx
 import mcp.types as types
 from mcp.server.lowlevel import Server
 
+try:
+    import uvloop
+except ImportError:  # uvloop 为可选依赖，缺失时使用默认事件循环
+    uvloop = None
+
+# 单个页面允许读取的最大字节数，超出则直接报错，避免大页面占满内存
+MAX_BYTES = 4 * 1024 * 1024
+
+# 所有 fetch 调用共享同一个客户端，复用连接池和 keep-alive 连接
+_CLIENT: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = httpx.AsyncClient(
+            follow_redirects=True,
+            headers={
+                "User-Agent": "MCP Test Server (github.com/modelcontextprotocol/python-sdk)"
+            },
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=httpx.Timeout(10.0),
+        )
+    return _CLIENT
+
+
+async def close_client() -> None:
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
 
 async def fetch_website(
     url: str,
 ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-    headers = {
-        "User-Agent": "MCP Test Server (github.com/modelcontextprotocol/python-sdk)"
-    }
-    async with httpx.AsyncClient(follow_redirects=True, headers=headers) as client:
-        response = await client.get(url)
+    async with get_client().stream("GET", url) as response:
         response.raise_for_status()
-        return [types.TextContent(type="text", text=response.text)]
+        buf = bytearray()
+        async for chunk in response.aiter_bytes(65536):
+            buf += chunk
+            if len(buf) > MAX_BYTES:
+                raise ValueError(f"Response too large (> {MAX_BYTES} bytes): {url}")
+        text = buf.decode(response.encoding or "utf-8", errors="replace")
+    return [types.TextContent(type="text", text=text)]
+
+
+# 短时间内对同一 URL 的并发/重复请求合并为一次抓取
+FETCH_CACHE_TTL = 5.0
+FETCH_CACHE_SIZE = 16
+_inflight: dict[str, asyncio.Task] = {}
+_recent: dict[str, tuple[float, list]] = {}
+
+
+def _evict_expired(now: float) -> None:
+    # 按插入顺序排列，过期时间单调递增，从头部删除到第一个未过期的条目即可
+    while _recent:
+        url = next(iter(_recent))
+        if _recent[url][0] > now:
+            break
+        del _recent[url]
+
+
+def _on_fetch_done(url: str, task: asyncio.Task) -> None:
+    _inflight.pop(url, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    now = time.monotonic()
+    _evict_expired(now)
+    _recent.pop(url, None)
+    _recent[url] = (now + FETCH_CACHE_TTL, task.result())
+    while len(_recent) > FETCH_CACHE_SIZE:
+        _recent.pop(next(iter(_recent)))
+
+
+async def fetch_website_shared(
+    url: str,
+) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+    _evict_expired(time.monotonic())
+    cached = _recent.get(url)
+    if cached is not None:
+        return cached[1]
+
+    task = _inflight.get(url)
+    if task is None:
+        task = asyncio.ensure_future(fetch_website(url))
+        _inflight[url] = task
+        task.add_done_callback(lambda t: _on_fetch_done(url, t))
+    # shield 防止某个调用方取消时连带取消其他调用方共享的抓取
+    return await asyncio.shield(task)
 
 
 @click.command()
@@ -36,7 +118,7 @@ def main(port: int, transport: str) -> int:
             raise ValueError(f"Unknown tool: {name}")
         if "url" not in arguments:
             raise ValueError("Missing required argument 'url'")
-        return await fetch_website(arguments["url"])
+        return await fetch_website_shared(arguments["url"])
 
     @app.list_tools()
     async def list_tools() -> list[types.Tool]:
@@ -58,6 +140,8 @@ def main(port: int, transport: str) -> int:
         ]
 
     if transport == "sse":
+        import contextlib
+
         from mcp.server.sse import SseServerTransport
         from starlette.applications import Starlette
         from starlette.routing import Mount, Route
@@ -90,17 +174,30 @@ def main(port: int, transport: str) -> int:
                     streams[0], streams[1], app.create_initialization_options()
                 )
 
+        @contextlib.asynccontextmanager
+        async def lifespan(starlette_app):
+            # 服务关闭时释放共享的 HTTP 客户端
+            try:
+                yield
+            finally:
+                await close_client()
+
         starlette_app = Starlette(
             debug=True,
             routes=[
                 Route("/", endpoint=handle_sse),
                 Mount("/messages/", app=sse.handle_post_message),
             ],
+            lifespan=lifespan,
         )
 
         import uvicorn
 
-        uvicorn.run(starlette_app, host="0.0.0.0", port=port)
+        uvicorn.run(
+            starlette_app,
+            host="0.0.0.0",
+            port=port,
+        )
     else:
         from mcp.server.stdio import stdio_server
         
@@ -108,12 +205,15 @@ def main(port: int, transport: str) -> int:
         print("等待输入中... 按 Ctrl+C 退出")
         
         async def arun():
-            async with stdio_server() as streams:
-                await app.run(
-                    streams[0], streams[1], app.create_initialization_options()
-                )
+            try:
+                async with stdio_server() as streams:
+                    await app.run(
+                        streams[0], streams[1], app.create_initialization_options()
+                    )
+            finally:
+                await close_client()
 
-        anyio.run(arun)
+        anyio.run(arun, backend_options={"use_uvloop": uvloop is not None})
 
     return 0
 
@@ -1,8 +1,14 @@
 import os
 import sys
 import json
+import asyncio
+import atexit
+import itertools
+import mmap
+import select
 from pathlib import Path
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Any
 from mcp.server import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
@@ -17,31 +23,166 @@ from urllib.parse import unquote
 import logging
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # uvloop 为可选依赖（不支持 Windows），缺失时使用默认事件循环
+    uvloop = None
+
+try:
+    import simdjson
+except ImportError:  # pysimdjson 为可选依赖，仅用于启动时解析大文件
+    simdjson = None
+
 MEMORY_VERSION="1.2.0"
 
+logger = logging.getLogger(__name__)
+
+# 程序所在目录：打包后的 exe 运行时为可执行文件目录，源代码运行时为本文件目录
+BASE_DIR = Path(sys.executable).parent if getattr(sys, 'frozen', False) else Path(__file__).parent
+CONFIG_PATH = BASE_DIR / "config.json"
+
+# 追加日志中的记录数超过存活记录数的该倍数时，整体重写文件进行压缩
+COMPACT_RATIO = 2
+
+# 压缩时整体重写文件使用的写缓冲大小
+LOG_BUFFER_SIZE = 1 << 20
+
+# 实体数超过该值时，search_nodes 在工作线程中扫描，避免阻塞事件循环
+SEARCH_THREAD_THRESHOLD = 5000
+
+# search_nodes 序列化结果缓存的总字符数上限，超过时按 LRU 淘汰
+SEARCH_CACHE_MAX_CHARS = 16 << 20
+# 单条结果超过该字符数时不缓存，避免少数大结果挤掉其他查询
+SEARCH_CACHE_MAX_ENTRY = 1 << 20
+
+# 资源变更通知的合并等待时间（秒）
+RESOURCE_NOTIFY_DELAY = 0.02
+
+# 启动时等待 stdin 管道数据的最长时间（秒）
+STDIN_WAIT = 1.0
+
+# 文件超过该大小（字节）时通过 mmap 读取，由页缓存直接提供数据
+MMAP_THRESHOLD = 1_000_000
+
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _line_loader():
+    """返回解析 NDJSON 行的函数，优先使用 simdjson 的 SIMD 解析器"""
+    if simdjson is not None:
+        parser = simdjson.Parser()
+        # recursive=True 直接转换为 Python 对象，解析器复用内部缓冲区也不受影响
+        return lambda line: parser.parse(line, True)
+    return json_loads
+
+def json_dumps(obj, indent: bool = False) -> str:
+    """序列化为不转义非 ASCII 字符的 JSON 字符串，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+def _record_bytes(obj) -> bytes:
+    """将一条存储记录序列化为 UTF-8 字节，orjson 直接输出字节，省去一次编码"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
 # 定义数据结构 
-@dataclass
+@dataclass(slots=True)
 class Entity:
     name: str
     entityType: str
     observations: list
+    # 与 observations 同步的集合，用于 O(1) 判断观察是否已存在
+    observations_set: set = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.observations_set = set(self.observations)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Entity":
+        # 按位置传参，省去 **data 展开时构建的临时参数字典
+        return cls(data["name"], data["entityType"], data["observations"])
 
-@dataclass
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "entityType": self.entityType,
+            "observations": self.observations
+        }
+
+@dataclass(slots=True)
 class Relation:
     from_: str  # 使用 from_ 避免与 Python 关键字冲突
     to: str
     relationType: str
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: dict) -> "Relation":
+        return cls(data["from_"], data["to"], data["relationType"])
+
+    def to_dict(self) -> dict:
+        return {
+            "from_": self.from_,
+            "to": self.to,
+            "relationType": self.relationType
+        }
+
+@dataclass(slots=True)
 class KnowledgeGraph:
     entities: list
     relations: list
 
+def _graph_to_dict(graph: KnowledgeGraph) -> dict:
+    return {
+        "entities": [e.to_dict() for e in graph.entities],
+        "relations": [r.to_dict() for r in graph.relations]
+    }
+
+def _graph_to_json(graph: KnowledgeGraph, indent: bool = False) -> str:
+    return json_dumps(_graph_to_dict(graph), indent=indent)
+
+def _relation_key(relation: Relation) -> tuple:
+    return (relation.from_, relation.to, relation.relationType)
+
+def _search_haystack(entity: Entity) -> str:
+    """将实体的名称、类型和观察拼接并统一大小写，供 search_nodes 做子串匹配"""
+    return "\x00".join([entity.name, entity.entityType, *entity.observations]).casefold()
+
+def _scan_haystacks(items, q: str) -> list:
+    """返回搜索文本包含子串 q 的实体名称"""
+    return [name for name, haystack in items if q in haystack]
+
 class KnowledgeGraphManager:
     def __init__(self, memory_path: str):
         self.memory_path = Path(memory_path).expanduser()
         self.memory_path.parent.mkdir(parents=True, exist_ok=True)
         self.change_listeners = []  # 添加变更监听器列表
+        self.version = 0  # 图谱版本号，每次变更递增，供派生数据判断是否过期
+        self._record_count = 0  # 文件中的记录总数（含追加日志）
+        self._ends_with_newline = True
+        self._graph = None  # 内存中缓存的知识图谱，首次访问时从文件加载
+        self._file_stat = None  # 缓存对应的文件 (st_mtime_ns, st_size)，用于发现外部修改
+        self._lock = asyncio.Lock()  # 串行化对缓存图谱的读写
+        self._entities_by_name = {}  # 实体名称 -> Entity
+        self._relation_keys = set()  # (from, to, relationType) 集合
+        self._rel_out = {}  # 实体名称 -> {关系键: 以该实体为起点的 Relation}
+        self._rel_in = {}  # 实体名称 -> {关系键: 以该实体为终点的 Relation}
+        self._haystacks = {}  # 实体名称 -> 预先统一大小写的搜索文本
+        self._log_fh = None  # 追加日志的长期写句柄，首次追加时打开
+        self._read_graph_json = None  # read_graph 的序列化结果缓存，图谱变更时清空
+        self._search_cache = OrderedDict()  # 查询 -> search_nodes 的序列化结果，LRU 淘汰
+        self._search_cache_chars = 0  # 缓存中结果的总字符数
+        atexit.register(self.close)
 
     def add_change_listener(self, listener):
         """添加知识图谱变更监听器"""
@@ -49,201 +190,745 @@ class KnowledgeGraphManager:
         
     def notify_changes(self):
         """通知所有监听器知识图谱已变更"""
+        self.version += 1
+        self._read_graph_json = None
+        self._search_cache.clear()
+        self._search_cache_chars = 0
         for listener in self.change_listeners:
             listener()
 
     async def load_graph(self) -> KnowledgeGraph:
+        async with self._lock:
+            return await self._get_graph()
+
+    async def _get_graph(self) -> KnowledgeGraph:
+        """返回缓存的图谱，调用方需持有 self._lock"""
+        if self._graph is not None and self._stat_file() != self._file_stat:
+            # 文件被其他进程修改过，丢弃缓存重新加载
+            await asyncio.to_thread(self._close_log)
+            self._graph = None
+            self.notify_changes()
+        if self._graph is None:
+            # 解析是阻塞的文件读取，放到线程中执行以免阻塞事件循环；
+            # 读取失败时直接抛出，不能以空图谱继续运行，否则压缩时会覆盖原有数据
+            try:
+                graph = await asyncio.to_thread(self._parse_file)
+            except Exception:
+                logger.exception("Error loading graph from %s", self.memory_path)
+                raise
+            self._rebuild_indexes(graph)
+            self._graph = graph
+        return self._graph
+
+    def _rebuild_indexes(self, graph: KnowledgeGraph):
+        self._entities_by_name = {e.name: e for e in graph.entities}
+        self._relation_keys = set()
+        self._rel_out = {}
+        self._rel_in = {}
+        for r in graph.relations:
+            self._index_relation(r)
+        self._haystacks = {e.name: _search_haystack(e) for e in graph.entities}
+
+    def _index_relation(self, relation: Relation):
+        key = _relation_key(relation)
+        self._relation_keys.add(key)
+        self._rel_out.setdefault(relation.from_, {})[key] = relation
+        self._rel_in.setdefault(relation.to, {})[key] = relation
+
+    def _unindex_relation(self, key: tuple):
+        from_, to, _ = key
+        self._relation_keys.discard(key)
+        self._rel_out.get(from_, {}).pop(key, None)
+        self._rel_in.get(to, {}).pop(key, None)
+
+    def _stat_file(self):
         try:
-            if not self.memory_path.exists():
-                return KnowledgeGraph(entities=[], relations=[])
+            st = os.stat(self.memory_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _parse_file(self) -> KnowledgeGraph:
+        # 解析前记录文件状态，解析期间若被修改，下次访问会重新加载
+        self._file_stat = self._stat_file()
+        if self._file_stat is None:
+            self._record_count = 0
+            self._ends_with_newline = True
+            return KnowledgeGraph(entities=[], relations=[])
+
+        # 回放过程中用有序字典保存实体和关系，墓碑记录可以直接按键删除
+        entities_by_name = {}
+        relations = {}
+        keys_by_name = {}  # 实体名 -> 以其为端点的关系键
+        record_count = 0
+        ends_with_newline = True
+        loads = _line_loader()
+        
+        # 逐行读取解析，不把整个文件读成一个字符串再切分
+        for lineno, line in enumerate(self._iter_lines(), 1):
+            ends_with_newline = line.endswith(b"\n")
+            line = line.strip()
+            if not line:
+                continue
                 
-            data = await self._read_file()
-            graph = KnowledgeGraph(entities=[], relations=[])
-            
-            for line in data.split("\n"):
-                if not line.strip():
-                    continue
-                    
-                item = json.loads(line)
+            record_count += 1
+            # 单行损坏只跳过该行，不影响其余记录的加载
+            try:
+                item = loads(line)
                 if item["type"] == "entity":
-                    graph.entities.append(Entity(
+                    entity = Entity(
                         name=item["name"],
                         entityType=item["entityType"],
                         observations=item["observations"]
-                    ))
+                    )
+                    entities_by_name[entity.name] = entity
                 elif item["type"] == "relation":
-                    graph.relations.append(Relation(
+                    relation = Relation(
                         from_=item["from"],
                         to=item["to"],
                         relationType=item["relationType"]
-                    ))
-            
-            return graph
-            
-        except Exception as e:
-            print(f"Error loading graph: {e}")
-            return KnowledgeGraph(entities=[], relations=[])
+                    )
+                    key = _relation_key(relation)
+                    relations[key] = relation
+                    keys_by_name.setdefault(relation.from_, set()).add(key)
+                    keys_by_name.setdefault(relation.to, set()).add(key)
+                elif item["type"] == "observation_add":
+                    # 追加写入的观察记录，回放到对应实体上
+                    entity = entities_by_name.get(item["entityName"])
+                    if entity:
+                        entity.observations.extend(item["contents"])
+                        entity.observations_set.update(item["contents"])
+                elif item["type"] == "tombstone_entity":
+                    # 删除实体时同时删除以其为端点的关系
+                    entities_by_name.pop(item["name"], None)
+                    for key in keys_by_name.pop(item["name"], ()):
+                        relations.pop(key, None)
+                elif item["type"] == "tombstone_relation":
+                    relations.pop((item["from"], item["to"], item["relationType"]), None)
+                elif item["type"] == "tombstone_obs":
+                    entity = entities_by_name.get(item["entityName"])
+                    if entity:
+                        to_delete = set(item["observations"])
+                        entity.observations = [o for o in entity.observations 
+                                             if o not in to_delete]
+                        entity.observations_set -= to_delete
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Skipping malformed record on line %d of %s", lineno, self.memory_path)
+        
+        graph = KnowledgeGraph(entities=list(entities_by_name.values()),
+                               relations=list(relations.values()))
+        self._record_count = record_count
+        self._ends_with_newline = ends_with_newline
+        return graph
+
+    def _entity_record(self, entity: Entity) -> bytes:
+        return _record_bytes({
+            "type": "entity",
+            "name": entity.name,
+            "entityType": entity.entityType,
+            "observations": entity.observations
+        })
+
+    def _relation_record(self, relation: Relation) -> bytes:
+        return _record_bytes({
+            "type": "relation", 
+            "from": relation.from_,
+            "to": relation.to,
+            "relationType": relation.relationType
+        })
 
     async def save_graph(self, graph: KnowledgeGraph):
         try:
-            lines = []
-            for entity in graph.entities:
-                lines.append(json.dumps({
-                    "type": "entity",
-                    "name": entity.name,
-                    "entityType": entity.entityType,
-                    "observations": entity.observations
-                }, ensure_ascii=False))
-                
-            for relation in graph.relations:
-                lines.append(json.dumps({
-                    "type": "relation", 
-                    "from": relation.from_,
-                    "to": relation.to,
-                    "relationType": relation.relationType
-                }, ensure_ascii=False))
-                
-            await self._write_file("\n".join(lines))
+            # 逐条序列化并写入缓冲区，不再拼接出整个文件大小的字符串
+            lines = itertools.chain(
+                map(self._entity_record, graph.entities),
+                map(self._relation_record, graph.relations)
+            )
+            await self._write_file(lines)
+            self._record_count = len(graph.entities) + len(graph.relations)
+            self._ends_with_newline = True
             
-        except Exception as e:
-            print(f"Error saving graph: {e}")
+        except Exception:
+            logger.exception("Error saving graph to %s", self.memory_path)
             raise
         
         self.notify_changes()  # 通知变更
 
-    async def _read_file(self) -> str:
-        with open(self.memory_path, "r", encoding="utf-8") as f:
-            return f.read()
+    async def _append_lines(self, graph: KnowledgeGraph, lines: list):
+        """只把新增的记录（包括删除用的墓碑记录）追加到文件末尾，
+        失效记录超过一半（日志膨胀到存活记录的两倍以上）时再整体压缩"""
+        if not lines:
+            return
+        try:
+            content = b"".join(line + b"\n" for line in lines)
+            if not self._ends_with_newline:
+                content = b"\n" + content
+            await self._append_file(content)
+            self._record_count += len(lines)
+            self._ends_with_newline = True
+        except Exception:
+            logger.exception("Error appending to %s", self.memory_path)
+            raise
+
+        if self._record_count > COMPACT_RATIO * (len(graph.entities) + len(graph.relations)):
+            await self.compact(graph)
+        else:
+            self.notify_changes()  # 通知变更
 
-    async def _write_file(self, content: str):
-        with open(self.memory_path, "w", encoding="utf-8", newline="\n") as f:
-            f.write(content)
+    async def compact(self, graph: KnowledgeGraph):
+        """将追加日志重写为只包含当前存活记录的文件"""
+        await self.save_graph(graph)
+
+    def _iter_lines(self):
+        with open(self.memory_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    yield from iter(mm.readline, b"")
+            else:
+                yield from f
+
+    async def _write_file(self, lines):
+        await asyncio.to_thread(self._write_file_sync, lines)
+
+    def _write_file_sync(self, lines):
+        # 整体重写前先关闭追加句柄，之后的追加写入新文件
+        self._close_log()
+        # 先写临时文件再原子替换，压缩中途出错不会损坏原文件
+        tmp_path = self.memory_path.with_name(self.memory_path.name + ".tmp")
+        with open(tmp_path, "wb", buffering=LOG_BUFFER_SIZE) as f:
+            for line in lines:
+                f.write(line)
+                f.write(b"\n")
+        os.replace(tmp_path, self.memory_path)
+        self._file_stat = self._stat_file()
+
+    async def _append_file(self, content: bytes):
+        await asyncio.to_thread(self._append_file_sync, content)
+
+    def _append_file_sync(self, content: bytes):
+        if self._log_fh is None:
+            self._log_fh = open(self.memory_path, "ab")
+        # 每次修改返回前都写入操作系统，进程被 SIGTERM 等信号直接终止时记录也不会丢失
+        self._log_fh.write(content)
+        self._log_fh.flush()
+        self._file_stat = self._stat_file()
+
+    def _close_log(self):
+        if self._log_fh is None:
+            return
+        self._log_fh.close()
+        self._log_fh = None
+
+    def close(self):
+        """关闭追加句柄"""
+        self._close_log()
 
     async def create_entities(self, entities: list) -> list:
-        graph = await self.load_graph()
-        new_entities = [e for e in entities 
-                       if not any(ex.name == e.name for ex in graph.entities)]
-        graph.entities.extend(new_entities)
-        await self.save_graph(graph) 
-        return new_entities
+        async with self._lock:
+            graph = await self._get_graph()
+            new_entities = []
+            for e in entities:
+                if e.name not in self._entities_by_name:
+                    self._entities_by_name[e.name] = e
+                    self._haystacks[e.name] = _search_haystack(e)
+                    new_entities.append(e)
+            graph.entities.extend(new_entities)
+            await self._append_lines(graph, [self._entity_record(e) for e in new_entities])
+            return new_entities
 
     async def create_relations(self, relations: list) -> list:
-        graph = await self.load_graph()
-        new_relations = [r for r in relations 
-                        if not any(ex.from_ == r.from_ and 
-                                 ex.to == r.to and 
-                                 ex.relationType == r.relationType 
-                                 for ex in graph.relations)]
-        graph.relations.extend(new_relations)
-        await self.save_graph(graph)
-        return new_relations
+        async with self._lock:
+            graph = await self._get_graph()
+            new_relations = []
+            for r in relations:
+                key = _relation_key(r)
+                if key not in self._relation_keys:
+                    self._index_relation(r)
+                    new_relations.append(r)
+            graph.relations.extend(new_relations)
+            await self._append_lines(graph, [self._relation_record(r) for r in new_relations])
+            return new_relations
 
     async def add_observations(self, observations: list) -> list:
-        graph = await self.load_graph()
-        results = []
+        async with self._lock:
+            graph = await self._get_graph()
+            results = []
+            lines = []
         
-        for obs in observations:
-            entity = next((e for e in graph.entities if e.name == obs["entityName"]), None)
-            if not entity:
-                raise ValueError(f"Entity with name {obs['entityName']} not found")
-                
-            new_observations = [c for c in obs["contents"] 
-                              if c not in entity.observations]
-            entity.observations.extend(new_observations)
+            # 先校验所有实体都存在并读取全部参数，避免抛错时缓存中的图谱已被部分修改
+            targets = []
+            for obs in observations:
+                entity = self._entities_by_name.get(obs["entityName"])
+                if not entity:
+                    raise ValueError(f"Entity with name {obs['entityName']} not found")
+                targets.append((obs, entity, list(obs["contents"])))
+
+            for obs, entity, contents in targets:
+                new_observations = []
+                for c in contents:
+                    if c not in entity.observations_set:
+                        entity.observations_set.add(c)
+                        new_observations.append(c)
+                entity.observations.extend(new_observations)
+                if new_observations:
+                    self._haystacks[entity.name] = _search_haystack(entity)
             
-            results.append({
-                "entityName": obs["entityName"],
-                "addedObservations": new_observations
-            })
+                if new_observations:
+                    lines.append(_record_bytes({
+                        "type": "observation_add",
+                        "entityName": obs["entityName"],
+                        "contents": new_observations
+                    }))
+                results.append({
+                    "entityName": obs["entityName"],
+                    "addedObservations": new_observations
+                })
             
-        await self.save_graph(graph)
-        return results
+            await self._append_lines(graph, lines)
+            return results
 
     async def delete_entities(self, entity_names: list) -> None:
-        graph = await self.load_graph()
-        graph.entities = [e for e in graph.entities 
-                         if e.name not in entity_names]
-        graph.relations = [r for r in graph.relations 
-                         if r.from_ not in entity_names and 
-                         r.to not in entity_names]
-        await self.save_graph(graph) 
+        async with self._lock:
+            graph = await self._get_graph()
+            entity_names = set(entity_names)
+            existing = entity_names & self._entities_by_name.keys()
+            if existing:
+                graph.entities = [e for e in graph.entities 
+                                 if e.name not in existing]
+            # 只维护被删除部分的索引，不再对整个图谱重建索引和搜索文本
+            for name in existing:
+                del self._entities_by_name[name]
+                self._haystacks.pop(name, None)
+            # 通过端点索引找出需要删除的关系，代价只与被删实体的度数相关
+            dropped_keys = set()
+            tombstones = []
+            for name in entity_names:
+                keys = self._rel_out.pop(name, {}).keys() | self._rel_in.pop(name, {}).keys()
+                if name in existing or keys:
+                    tombstones.append({"type": "tombstone_entity", "name": name})
+                dropped_keys |= keys
+            for key in dropped_keys:
+                self._unindex_relation(key)
+            if dropped_keys:
+                graph.relations = [r for r in graph.relations 
+                                 if _relation_key(r) not in dropped_keys]
+            # 追加墓碑记录代替整体重写文件
+            await self._append_lines(graph, [_record_bytes(t) for t in tombstones])
 
     async def delete_observations(self, deletions: list) -> None:
-        graph = await self.load_graph()
-        
-        for deletion in deletions:
-            entity = next((e for e in graph.entities 
-                          if e.name == deletion["entityName"]), None)
-            if entity:
-                entity.observations = [o for o in entity.observations 
-                                     if o not in deletion["observations"]]
+        async with self._lock:
+            graph = await self._get_graph()
+            tombstones = []
+
+            # 先读取全部参数，避免抛错时缓存中的图谱已被部分修改
+            targets = [(self._entities_by_name.get(deletion["entityName"]), list(deletion["observations"]))
+                       for deletion in deletions]
+
+            for entity, observations in targets:
+                if entity:
+                    to_delete = entity.observations_set & set(observations)
+                    if not to_delete:
+                        continue
+                    entity.observations = [o for o in entity.observations 
+                                         if o not in to_delete]
+                    entity.observations_set -= to_delete
+                    self._haystacks[entity.name] = _search_haystack(entity)
+                    tombstones.append({
+                        "type": "tombstone_obs",
+                        "entityName": entity.name,
+                        "observations": [o for o in observations if o in to_delete]
+                    })
                 
-        await self.save_graph(graph)
+            await self._append_lines(graph, [_record_bytes(t) for t in tombstones])
 
     async def delete_relations(self, relations: list) -> None:
-        graph = await self.load_graph()
-        graph.relations = [r for r in graph.relations 
-                         if not any(dr.from_ == r.from_ and 
-                                  dr.to == r.to and 
-                                  dr.relationType == r.relationType 
-                                  for dr in relations)]
-        await self.save_graph(graph)
+        async with self._lock:
+            graph = await self._get_graph()
+            to_delete = {_relation_key(r) for r in relations} & self._relation_keys
+            if to_delete:
+                graph.relations = [r for r in graph.relations 
+                                 if _relation_key(r) not in to_delete]
+            for key in to_delete:
+                self._unindex_relation(key)
+            await self._append_lines(graph, [
+                _record_bytes({"type": "tombstone_relation", "from": f, "to": t, "relationType": rt})
+                for f, t, rt in to_delete
+            ])
 
     async def read_graph(self) -> KnowledgeGraph:
         return await self.load_graph()
 
+    async def read_graph_json(self, indent: bool = False) -> str:
+        """返回整个图谱的 JSON，紧凑格式的结果会缓存到下一次变更"""
+        async with self._lock:
+            graph = await self._get_graph()
+            # 序列化整个图谱是纯 CPU 工作，放到线程中执行；持有锁期间图谱不会被修改
+            if indent:
+                return await asyncio.to_thread(_graph_to_json, graph, True)
+            if self._read_graph_json is None:
+                self._read_graph_json = await asyncio.to_thread(_graph_to_json, graph)
+            return self._read_graph_json
+
+    async def search_nodes_json(self, query: str, indent: bool = False) -> str:
+        """返回 search_nodes 结果的 JSON，紧凑格式按查询缓存到下一次变更"""
+        if indent:
+            return json_dumps(_graph_to_dict(await self.search_nodes(query)), indent=True)
+        await self.load_graph()
+        text = self._search_cache.get(query)
+        if text is not None:
+            self._search_cache.move_to_end(query)
+            return text
+        version = self.version
+        text = json_dumps(_graph_to_dict(await self.search_nodes(query)))
+        # 搜索期间图谱发生变更时结果可能已过期，不写入缓存；过大的结果也不缓存
+        if version == self.version and len(text) <= SEARCH_CACHE_MAX_ENTRY:
+            old = self._search_cache.pop(query, None)
+            if old is not None:
+                self._search_cache_chars -= len(old)
+            self._search_cache[query] = text
+            self._search_cache_chars += len(text)
+            while self._search_cache_chars > SEARCH_CACHE_MAX_CHARS:
+                _, evicted = self._search_cache.popitem(last=False)
+                self._search_cache_chars -= len(evicted)
+        return text
+
     async def search_nodes(self, query: str) -> KnowledgeGraph:
-        graph = await self.load_graph()
-        #print(f"Searching for nodes with query: {query}")
+        await self.load_graph()
         
-        # 过滤实体
-        filtered_entities = [e for e in graph.entities 
-                           if (query.lower() in e.name.lower() or
-                               query.lower() in e.entityType.lower() or
-                               any(query.lower() in o.lower() 
-                                   for o in e.observations))]
+        # 过滤实体：查询只统一一次大小写，实体文本已在索引中预处理，
+        # 同一遍遍历中同时收集实体和名称集合
+        q = query.casefold()
+        if len(self._haystacks) > SEARCH_THREAD_THRESHOLD:
+            # 扫描期间索引可能被修改，先取快照再交给线程
+            matched = await asyncio.to_thread(_scan_haystacks, list(self._haystacks.items()), q)
+        else:
+            matched = _scan_haystacks(self._haystacks.items(), q)
+
+        filtered_entities = []
+        filtered_entity_names = set()
+        for name in matched:
+            entity = self._entities_by_name.get(name)
+            if entity is not None:
+                filtered_entities.append(entity)
+                filtered_entity_names.add(name)
         
-        # 创建过滤后的实体名称集合
-        filtered_entity_names = {e.name for e in filtered_entities}
-
-        #print(f"filtered_entities: {filtered_entity_names}")
-        
-        # 过滤关系
-        filtered_relations = [r for r in graph.relations 
-                            if r.from_ in filtered_entity_names and 
-                            r.to in filtered_entity_names]
-        
-        return KnowledgeGraph(
-            entities=filtered_entities,
-            relations=filtered_relations
-        )
+        return self._induced_subgraph(filtered_entities, filtered_entity_names)
 
     async def open_nodes(self, names: list) -> KnowledgeGraph:
-        graph = await self.load_graph()
+        await self.load_graph()
         
-        # 过滤实体
-        filtered_entities = [e for e in graph.entities 
-                           if e.name in names]
+        # 过滤实体：按名称直接查索引，无需遍历全部实体
+        filtered_entities = []
+        filtered_entity_names = set()
+        for name in names:
+            entity = self._entities_by_name.get(name)
+            if entity is not None and name not in filtered_entity_names:
+                filtered_entities.append(entity)
+                filtered_entity_names.add(name)
         
-        # 创建过滤后的实体名称集合
-        filtered_entity_names = {e.name for e in filtered_entities}
-        
-        # 过滤关系
-        filtered_relations = [r for r in graph.relations 
-                            if r.from_ in filtered_entity_names and 
-                            r.to in filtered_entity_names]
+        return self._induced_subgraph(filtered_entities, filtered_entity_names)
+
+    async def list_entity_names(self) -> list:
+        """按图谱中的顺序返回所有实体名称，直接取自名称索引"""
+        await self.load_graph()
+        return list(self._entities_by_name)
+
+    async def get_entity(self, name: str) -> tuple:
+        """按名称查找实体及以其为端点的关系，实体不存在时返回 (None, [])"""
+        await self.load_graph()
+        entity = self._entities_by_name.get(name)
+        if entity is None:
+            return None, []
+        # 合并出边和入边，自环关系只出现一次
+        relations = {**self._rel_out.get(name, {}), **self._rel_in.get(name, {})}
+        return entity, list(relations.values())
+
+    def _induced_subgraph(self, entities: list, names: set) -> KnowledgeGraph:
+        """返回给定实体及两端都在其中的关系构成的子图"""
+        # 通过出边索引只检查这些实体的关系，代价与其度数相关而非关系总数
+        filtered_relations = [r for e in entities 
+                            for r in self._rel_out.get(e.name, {}).values() 
+                            if r.to in names]
         
         return KnowledgeGraph(
-            entities=filtered_entities,
+            entities=entities,
             relations=filtered_relations
         )
     
+# 工具列表是固定的，在导入时构建一次，list_tools 直接返回
+TOOLS = [
+    types.Tool(
+        name="create_entities",
+        description="Create multiple new entities in the knowledge graph",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "entities": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "entityType": {"type": "string"},
+                            "observations": {
+                                "type": "array",
+                                "items": {"type": "string"}
+                            }
+                        },
+                        "required": ["name", "entityType", "observations"]
+                    }
+                }
+            },
+            "required": ["entities"]
+        }
+    ),
+    types.Tool(
+        name="create_relations",
+        description="Create multiple new relations between entities in the knowledge graph",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "relations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "from_": {"type": "string"},
+                            "to": {"type": "string"},
+                            "relationType": {"type": "string"}
+                        },
+                        "required": ["from_", "to", "relationType"]
+                    }
+                }
+            },
+            "required": ["relations"]
+        }
+    ),
+    types.Tool(
+        name="add_observations",
+        description="Add new observations to existing entities",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "observations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "entityName": {"type": "string"},
+                            "contents": {
+                                "type": "array",
+                                "items": {"type": "string"}
+                            }
+                        },
+                        "required": ["entityName", "contents"]
+                    }
+                }
+            },
+            "required": ["observations"]
+        }
+    ),
+    types.Tool(
+        name="delete_entities",
+        description="Delete multiple entities and their relations",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "entityNames": {
+                    "type": "array",
+                    "items": {"type": "string"}
+                }
+            },
+            "required": ["entityNames"]
+        }
+    ),
+    types.Tool(
+        name="delete_observations",
+        description="Delete specific observations from entities",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "deletions": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "entityName": {"type": "string"},
+                            "observations": {
+                                "type": "array",
+                                "items": {"type": "string"}
+                            }
+                        },
+                        "required": ["entityName", "observations"]
+                    }
+                }
+            },
+            "required": ["deletions"]
+        }
+    ),
+    types.Tool(
+        name="delete_relations",
+        description="Delete multiple relations from the graph",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "relations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "from_": {"type": "string"},
+                            "to": {"type": "string"},
+                            "relationType": {"type": "string"}
+                        },
+                        "required": ["from_", "to", "relationType"]
+                    }
+                }
+            },
+            "required": ["relations"]
+        }
+    ),
+    types.Tool(
+        name="read_graph",
+        description="Read the entire knowledge graph",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "pretty": {"type": "boolean"}
+            }
+        }
+    ),
+    types.Tool(
+        name="search_nodes",
+        description="Search for nodes in the graph",
+        inputSchema={
+            "type": "object", 
+            "properties": {
+                "query": {"type": "string"},
+                "pretty": {"type": "boolean"}
+            },
+            "required": ["query"]
+        }
+    ),
+    types.Tool(
+        name="open_nodes",
+        description="Open specific nodes by their names",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "names": {
+                    "type": "array",
+                    "items": {"type": "string"}
+                },
+                "pretty": {"type": "boolean"}
+            },
+            "required": ["names"]
+        }
+    )
+]
+
+# 各工具的必填参数，取自工具定义的 inputSchema
+TOOL_REQUIRED_ARGS = {tool.name: tool.inputSchema.get("required", []) for tool in TOOLS}
+
+# memory_chat 的系统提示，list_prompts 和 get_prompt 共用同一个字符串
+MEMORY_CHAT_SYSTEM_PROMPT = """
+Follow these steps for each interaction:
+
+1. User Identification:
+   - You should assume that you are interacting with default_user
+   - If you have not identified default_user, proactively try to do so.
+
+2. Memory Retrieval:
+   - Always begin your chat by saying only "Remembering..." and retrieve all relevant information from your knowledge graph
+   - Always refer to your knowledge graph as your "memory"
+
+3. Memory
+   - While conversing with the user, be attentive to any new information that falls into these categories:
+     a) Basic Identity (age, gender, location, job title, education level, etc.)
+     b) Behaviors (interests, habits, etc.)
+     c) Preferences (communication style, preferred language, etc.)
+     d) Goals (goals, targets, aspirations, etc.)
+     e) Relationships (personal and professional relationships up to 3 degrees of separation)
+
+4. Memory Update:
+   - If any new information was gathered during the interaction, update your memory as follows:
+     a) Create entities for recurring organizations, people, and significant events
+     b) Connect them to the current entities using relations
+     b) Store facts about them as observations
+"""
+
+# 提示词和资源模板同样是固定的，在导入时构建一次
+PROMPTS = [
+    types.Prompt(
+        name="memory_chat",
+        description="与记忆助手进行对话，助手会记住用户信息并更新知识图谱",
+        systemPrompt=MEMORY_CHAT_SYSTEM_PROMPT
+    ),
+    types.Prompt(
+        name="knowledge_extractor",
+        description="从用户输入中提取关键知识点并创建实体和关系",
+        systemPrompt="""
+你是专业知识图谱构建专家，负责将非结构化文本转换为结构化知识。
+
+【提取步骤】
+1. 深入分析：仔细阅读用户输入，识别核心信息点
+2. 实体提取：识别所有重要概念、人物、地点、组织、事件、产品等
+3. 属性收集：为每个实体提取关键特征、描述和事实
+4. 关系映射：确定实体间的逻辑连接和交互方式
+5. 知识存储：使用工具函数将提取的知识保存到图谱中
+
+【质量标准】
+• 实体命名：精确、简洁、无歧义
+• 类型分配：选择最贴合实体本质的类型（人物/地点/概念/组织/事件/产品等）
+• 观察质量：客观、具体、信息丰富、避免重复
+• 关系准确性：清晰表达实体间真实联系，使用恰当的关系类型
+
+【工具使用指南】
+• create_entities({
+    "entities": [
+        {"name": "实体名称", "entityType": "实体类型", "observations": ["观察1", "观察2"]}
+    ]
+})
+• create_relations({
+    "relations": [
+        {"from_": "源实体名", "to": "目标实体名", "relationType": "关系类型"}
+    ]
+})
+
+【示例分析】
+输入：
+"特斯拉是埃隆·马斯克创立的电动汽车公司，总部位于美国加州，其Model 3是全球最畅销的电动汽车之一。"
+
+提取结果：
+1. 实体：
+   - {name: "特斯拉", entityType: "公司", observations: ["电动汽车公司", "总部位于美国加州", "生产Model 3车型"]}
+   - {name: "埃隆·马斯克", entityType: "人物", observations: ["创立了特斯拉"]}
+   - {name: "Model 3", entityType: "产品", observations: ["特斯拉生产", "全球最畅销的电动汽车之一"]}
+   - {name: "美国加州", entityType: "地点", observations: ["特斯拉总部所在地"]}
+
+2. 关系：
+   - {from_: "埃隆·马斯克", to: "特斯拉", relationType: "创立"}
+   - {from_: "特斯拉", to: "美国加州", relationType: "总部位于"}
+   - {from_: "特斯拉", to: "Model 3", relationType: "生产"}
+
+请直接分析用户输入并提取知识，无需解释你的分析过程。
+"""
+    )
+]
+
+# A URI template (according to RFC 6570)
+RESOURCE_TEMPLATES = [
+    types.ResourceTemplate(
+        name="memory_template",
+        uriTemplate="memory://short-story/{topic}",
+        description="从知识图谱中读取相关信息并生成短故事",
+        mimeType="text/plain"
+    )
+]
+
 def init_server(memory_path, log_level=logging.CRITICAL):
     # 添加日志设置
-    if getattr(sys, 'frozen', False):
-        log_path = Path(sys.executable).parent / "logs"
-    else:
-        log_path = Path(__file__).parent / "logs"
+    log_path = BASE_DIR / "logs"
     
     # 创建日志目录
     log_path.mkdir(exist_ok=True)
@@ -311,110 +996,71 @@ def init_server(memory_path, log_level=logging.CRITICAL):
     )
     
     # 添加资源变更通知函数
-    async def notify_resources_changed():
-        """通知客户端资源列表已变更"""
+    notify_tasks = {}  # 会话 -> 等待发送的资源变更通知，每个会话同一时间最多一个
+
+    async def notify_resources_changed(session):
+        """通知客户端资源列表已变更，等待片刻把连续的多次变更合并为一次通知"""
         logger = logging.getLogger(__name__)
-        logger.debug("发送资源变更通知")
         try:
-            await app.request_context.session.send_notification(
+            await asyncio.sleep(RESOURCE_NOTIFY_DELAY)
+            # 发送前清除标记，发送期间的新变更会再安排一次通知
+            notify_tasks.pop(session, None)
+            logger.debug("发送资源变更通知")
+            await session.send_notification(
                 types.ResourcesChangedNotification()
             )
         except Exception as e:
+            notify_tasks.pop(session, None)
             logger.error(f"发送资源变更通知失败: {e}")
     
     # 将通知函数添加为知识图谱变更监听器
     def on_graph_changed():
-        """当知识图谱变更时触发异步通知"""
-        import asyncio
-        asyncio.create_task(notify_resources_changed())
+        """当知识图谱变更时向发起变更的会话触发异步通知，该会话已有待发送的通知时不再重复创建"""
+        try:
+            session = app.request_context.session
+        except LookupError:
+            # 不在请求处理过程中（例如检测到文件被外部修改），没有可通知的会话
+            return
+        if session not in notify_tasks:
+            notify_tasks[session] = asyncio.create_task(notify_resources_changed(session))
     
     graph_manager.add_change_listener(on_graph_changed)
 
+    # 由整个图谱派生的数据按图谱版本缓存：名称 -> (版本号, 数据)
+    snapshot_cache = {}
+
     # 添加 prompt 功能
     @app.list_prompts()
     async def handle_list_prompts() -> list[types.Prompt]:
-        return [
-            types.Prompt(
-                name="memory_chat",
-                description="与记忆助手进行对话，助手会记住用户信息并更新知识图谱",
-                systemPrompt="""
-Follow these steps for each interaction:
-
-1. User Identification:
-   - You should assume that you are interacting with default_user
-   - If you have not identified default_user, proactively try to do so.
-
-2. Memory Retrieval:
-   - Always begin your chat by saying only "Remembering..." and retrieve all relevant information from your knowledge graph
-   - Always refer to your knowledge graph as your "memory"
-
-3. Memory
-   - While conversing with the user, be attentive to any new information that falls into these categories:
-     a) Basic Identity (age, gender, location, job title, education level, etc.)
-     b) Behaviors (interests, habits, etc.)
-     c) Preferences (communication style, preferred language, etc.)
-     d) Goals (goals, targets, aspirations, etc.)
-     e) Relationships (personal and professional relationships up to 3 degrees of separation)
-
-4. Memory Update:
-   - If any new information was gathered during the interaction, update your memory as follows:
-     a) Create entities for recurring organizations, people, and significant events
-     b) Connect them to the current entities using relations
-     b) Store facts about them as observations
-"""
-            ),
-            types.Prompt(
-                name="knowledge_extractor",
-                description="从用户输入中提取关键知识点并创建实体和关系",
-                systemPrompt="""
-你是专业知识图谱构建专家，负责将非结构化文本转换为结构化知识。
-
-【提取步骤】
-1. 深入分析：仔细阅读用户输入，识别核心信息点
-2. 实体提取：识别所有重要概念、人物、地点、组织、事件、产品等
-3. 属性收集：为每个实体提取关键特征、描述和事实
-4. 关系映射：确定实体间的逻辑连接和交互方式
-5. 知识存储：使用工具函数将提取的知识保存到图谱中
-
-【质量标准】
-• 实体命名：精确、简洁、无歧义
-• 类型分配：选择最贴合实体本质的类型（人物/地点/概念/组织/事件/产品等）
-• 观察质量：客观、具体、信息丰富、避免重复
-• 关系准确性：清晰表达实体间真实联系，使用恰当的关系类型
-
-【工具使用指南】
-• create_entities({
-    "entities": [
-        {"name": "实体名称", "entityType": "实体类型", "observations": ["观察1", "观察2"]}
-    ]
-})
-• create_relations({
-    "relations": [
-        {"from_": "源实体名", "to": "目标实体名", "relationType": "关系类型"}
-    ]
-})
-
-【示例分析】
-输入：
-"特斯拉是埃隆·马斯克创立的电动汽车公司，总部位于美国加州，其Model 3是全球最畅销的电动汽车之一。"
-
-提取结果：
-1. 实体：
-   - {name: "特斯拉", entityType: "公司", observations: ["电动汽车公司", "总部位于美国加州", "生产Model 3车型"]}
-   - {name: "埃隆·马斯克", entityType: "人物", observations: ["创立了特斯拉"]}
-   - {name: "Model 3", entityType: "产品", observations: ["特斯拉生产", "全球最畅销的电动汽车之一"]}
-   - {name: "美国加州", entityType: "地点", observations: ["特斯拉总部所在地"]}
-
-2. 关系：
-   - {from_: "埃隆·马斯克", to: "特斯拉", relationType: "创立"}
-   - {from_: "特斯拉", to: "美国加州", relationType: "总部位于"}
-   - {from_: "特斯拉", to: "Model 3", relationType: "生产"}
-
-请直接分析用户输入并提取知识，无需解释你的分析过程。
-"""
-            )
-        ]
+        return PROMPTS
         
+    async def build_user_context() -> str:
+        """根据 default_user 实体及其关系构建用户信息上下文"""
+        # 从知识图谱中按名称索引查找 default_user 实体及其关系
+        default_user, related_relations = await graph_manager.get_entity("default_user")
+        
+        if not default_user:
+            return ""
+        # 先收集各行再一次拼接，避免在循环中反复创建新字符串
+        parts = [
+            "用户信息:",
+            f"名称: {default_user.name}",
+            f"类型: {default_user.entityType}",
+            "观察:"
+        ]
+        parts.extend(f"- {obs}" for obs in default_user.observations)
+            
+        # 添加与用户相关的关系
+        if related_relations:
+            parts.append("")
+            parts.append("用户关系:")
+            for relation in related_relations:
+                if relation.from_ == "default_user":
+                    parts.append(f"- {relation.from_} {relation.relationType} {relation.to}")
+                else:
+                    parts.append(f"- {relation.to} {relation.relationType} {relation.from_}")
+        return "\n".join(parts) + "\n"
+
     @app.get_prompt()
     async def handle_get_prompt(name: str, arguments: dict[str, str] | None) -> types.GetPromptResult:
         logger = logging.getLogger(__name__)
@@ -428,58 +1074,20 @@ Follow these steps for each interaction:
         # 从上下文中获取请求 ID
         request_id = context.request_id
         
-        # 从知识图谱中获取用户信息
-        graph = await graph_manager.read_graph()
-        
-        # 查找 default_user 实体
-        default_user = next((e for e in graph.entities if e.name == "default_user"), None)
-        
-        # 构建用户信息上下文
-        user_context = ""
-        if default_user:
-            user_context = f"用户信息:\n名称: {default_user.name}\n类型: {default_user.entityType}\n观察:\n"
-            for obs in default_user.observations:
-                user_context += f"- {obs}\n"
-                
-            # 添加与用户相关的关系
-            related_relations = [r for r in graph.relations if r.from_ == "default_user" or r.to == "default_user"]
-            if related_relations:
-                user_context += "\n用户关系:\n"
-                for relation in related_relations:
-                    if relation.from_ == "default_user":
-                        user_context += f"- {relation.from_} {relation.relationType} {relation.to}\n"
-                    else:
-                        user_context += f"- {relation.to} {relation.relationType} {relation.from_}\n"
+        # 用户信息上下文只在图谱变更后重建，否则复用上次的结果
+        await graph_manager.load_graph()
+        cached = snapshot_cache.get("user_context")
+        if cached is not None and cached[0] == graph_manager.version:
+            user_context = cached[1]
+        else:
+            user_context = await build_user_context()
+            snapshot_cache["user_context"] = (graph_manager.version, user_context)
         
         # 构建消息列表
         messages = []
         
         # 添加系统消息
-        system_prompt = """
-Follow these steps for each interaction:
-
-1. User Identification:
-   - You should assume that you are interacting with default_user
-   - If you have not identified default_user, proactively try to do so.
-
-2. Memory Retrieval:
-   - Always begin your chat by saying only "Remembering..." and retrieve all relevant information from your knowledge graph
-   - Always refer to your knowledge graph as your "memory"
-
-3. Memory
-   - While conversing with the user, be attentive to any new information that falls into these categories:
-     a) Basic Identity (age, gender, location, job title, education level, etc.)
-     b) Behaviors (interests, habits, etc.)
-     c) Preferences (communication style, preferred language, etc.)
-     d) Goals (goals, targets, aspirations, etc.)
-     e) Relationships (personal and professional relationships up to 3 degrees of separation)
-
-4. Memory Update:
-   - If any new information was gathered during the interaction, update your memory as follows:
-     a) Create entities for recurring organizations, people, and significant events
-     b) Connect them to the current entities using relations
-     b) Store facts about them as observations
-"""
+        system_prompt = MEMORY_CHAT_SYSTEM_PROMPT
         
         if user_context:
             system_prompt += f"\n\n当前用户记忆:\n{user_context}"
@@ -512,24 +1120,20 @@ Follow these steps for each interaction:
     # 资源模板功能
     @app.list_resource_templates()
     async def handle_list_resource_templates() -> list[types.ResourceTemplate]:
-        # A URI template (according to RFC 6570)
-        return [
-            types.ResourceTemplate(
-                name="memory_template",
-                uriTemplate="memory://short-story/{topic}",
-                description="从知识图谱中读取相关信息并生成短故事",
-                mimeType="text/plain"
-            )
-        ]
+        return RESOURCE_TEMPLATES
     
     # 资源
     @app.list_resources()
     async def handle_list_resources() -> list[types.Resource]:
-        graph = await graph_manager.read_graph()
-        entity_names = [entity.name for entity in graph.entities]
+        # 资源列表只在图谱变更后重建，多个客户端的请求共享同一份结果
+        await graph_manager.load_graph()
+        cached = snapshot_cache.get("resources")
+        if cached is not None and cached[0] == graph_manager.version:
+            return cached[1]
+        entity_names = await graph_manager.list_entity_names()
         logger.debug(f"handle_list_resources: {len(entity_names)} nodes found")
 
-        return [types.Resource(
+        resources = [types.Resource(
                 name=name,
                 uri=f"memory://short-story/{name}",
                 description=f"主题{name}的短故事",
@@ -542,6 +1146,8 @@ Follow these steps for each interaction:
                 mimeType="text/plain"
             )
         ]
+        snapshot_cache["resources"] = (graph_manager.version, resources)
+        return resources
 
     # 修改 handle_read_resource 添加日志
     @app.read_resource()
@@ -566,8 +1172,7 @@ Follow these steps for each interaction:
             
             # 处理 "all" 请求 - 返回所有节点名称
             if str(uri) == "memory://topic":
-                graph = await graph_manager.read_graph()
-                entity_names = [entity.name for entity in graph.entities]
+                entity_names = await graph_manager.list_entity_names()
                 logger.debug(f"Returning all node names: {len(entity_names)} nodes found")
 
                 return [ReadResourceContents(
@@ -629,172 +1234,57 @@ Follow these steps for each interaction:
 
     @app.list_tools()
     async def handle_list_tools():
-        return [
-            types.Tool(
-                name="create_entities",
-                description="Create multiple new entities in the knowledge graph",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "entities": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "name": {"type": "string"},
-                                    "entityType": {"type": "string"},
-                                    "observations": {
-                                        "type": "array",
-                                        "items": {"type": "string"}
-                                    }
-                                },
-                                "required": ["name", "entityType", "observations"]
-                            }
-                        }
-                    },
-                    "required": ["entities"]
-                }
-            ),
-            types.Tool(
-                name="create_relations",
-                description="Create multiple new relations between entities in the knowledge graph",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "relations": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "from_": {"type": "string"},
-                                    "to": {"type": "string"},
-                                    "relationType": {"type": "string"}
-                                },
-                                "required": ["from_", "to", "relationType"]
-                            }
-                        }
-                    },
-                    "required": ["relations"]
-                }
-            ),
-            types.Tool(
-                name="add_observations",
-                description="Add new observations to existing entities",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "observations": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "entityName": {"type": "string"},
-                                    "contents": {
-                                        "type": "array",
-                                        "items": {"type": "string"}
-                                    }
-                                },
-                                "required": ["entityName", "contents"]
-                            }
-                        }
-                    },
-                    "required": ["observations"]
-                }
-            ),
-            types.Tool(
-                name="delete_entities",
-                description="Delete multiple entities and their relations",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "entityNames": {
-                            "type": "array",
-                            "items": {"type": "string"}
-                        }
-                    },
-                    "required": ["entityNames"]
-                }
-            ),
-            types.Tool(
-                name="delete_observations",
-                description="Delete specific observations from entities",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "deletions": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "entityName": {"type": "string"},
-                                    "observations": {
-                                        "type": "array",
-                                        "items": {"type": "string"}
-                                    }
-                                },
-                                "required": ["entityName", "observations"]
-                            }
-                        }
-                    },
-                    "required": ["deletions"]
-                }
-            ),
-            types.Tool(
-                name="delete_relations",
-                description="Delete multiple relations from the graph",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "relations": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "from_": {"type": "string"},
-                                    "to": {"type": "string"},
-                                    "relationType": {"type": "string"}
-                                },
-                                "required": ["from_", "to", "relationType"]
-                            }
-                        }
-                    },
-                    "required": ["relations"]
-                }
-            ),
-            types.Tool(
-                name="read_graph",
-                description="Read the entire knowledge graph",
-                inputSchema={
-                    "type": "object",
-                    "properties": {}
-                }
-            ),
-            types.Tool(
-                name="search_nodes",
-                description="Search for nodes in the graph",
-                inputSchema={
-                    "type": "object", 
-                    "properties": {
-                        "query": {"type": "string"}
-                    },
-                    "required": ["query"]
-                }
-            ),
-            types.Tool(
-                name="open_nodes",
-                description="Open specific nodes by their names",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "names": {
-                            "type": "array",
-                            "items": {"type": "string"}
-                        }
-                    },
-                    "required": ["names"]
-                }
-            )
-        ]
+        return TOOLS
+
+    async def call_read_graph(arguments: dict, pretty: bool) -> str:
+        return await graph_manager.read_graph_json(indent=pretty)
+
+    async def call_create_entities(arguments: dict, pretty: bool) -> str:
+        entities = list(map(Entity.from_dict, arguments["entities"]))
+        result = await graph_manager.create_entities(entities)
+        return json_dumps([e.to_dict() for e in result])
+
+    async def call_create_relations(arguments: dict, pretty: bool) -> str:
+        relations = list(map(Relation.from_dict, arguments["relations"]))
+        result = await graph_manager.create_relations(relations)
+        return json_dumps([r.to_dict() for r in result])
+
+    async def call_add_observations(arguments: dict, pretty: bool) -> str:
+        result = await graph_manager.add_observations(arguments["observations"])
+        return json_dumps(result)
+
+    async def call_delete_entities(arguments: dict, pretty: bool) -> str:
+        await graph_manager.delete_entities(arguments["entityNames"])
+        return "Entities deleted successfully"
+
+    async def call_delete_observations(arguments: dict, pretty: bool) -> str:
+        await graph_manager.delete_observations(arguments["deletions"])
+        return "Observations deleted successfully"
+
+    async def call_delete_relations(arguments: dict, pretty: bool) -> str:
+        relations = list(map(Relation.from_dict, arguments["relations"]))
+        await graph_manager.delete_relations(relations)
+        return "Relations deleted successfully"
+
+    async def call_search_nodes(arguments: dict, pretty: bool) -> str:
+        return await graph_manager.search_nodes_json(arguments["query"], indent=pretty)
+
+    async def call_open_nodes(arguments: dict, pretty: bool) -> str:
+        result = await graph_manager.open_nodes(arguments["names"])
+        return json_dumps(_graph_to_dict(result), indent=pretty)
+
+    # 工具名 -> 处理函数，按字典直接分发
+    tool_handlers = {
+        "read_graph": call_read_graph,
+        "create_entities": call_create_entities,
+        "create_relations": call_create_relations,
+        "add_observations": call_add_observations,
+        "delete_entities": call_delete_entities,
+        "delete_observations": call_delete_observations,
+        "delete_relations": call_delete_relations,
+        "search_nodes": call_search_nodes,
+        "open_nodes": call_open_nodes,
+    }
 
     @app.call_tool()
     async def handle_call_tool(
@@ -802,93 +1292,32 @@ Follow these steps for each interaction:
         arguments: dict | None
     ) -> list:
         try:
-            if name == "read_graph":
-                result = await graph_manager.read_graph()
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "entities": [vars(e) for e in result.entities],
-                        "relations": [vars(r) for r in result.relations]
-                    }, indent=2, ensure_ascii=False)
-                )]
-            
-            if not arguments:
-                raise ValueError("Missing arguments")
-                
-            if name == "create_entities":
-                entities = [Entity(**e) for e in arguments["entities"]]
-                result = await graph_manager.create_entities(entities)
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps([vars(e) for e in result], indent=2, ensure_ascii=False)
-                )]
-                
-            elif name == "create_relations":
-                relations = [Relation(**r) for r in arguments["relations"]]
-                result = await graph_manager.create_relations(relations)
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps([vars(r) for r in result], indent=2, ensure_ascii=False)
-                )]
-                
-            elif name == "add_observations":
-                result = await graph_manager.add_observations(arguments["observations"])
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2, ensure_ascii=False)
-                )]
-                
-            elif name == "delete_entities":
-                await graph_manager.delete_entities(arguments["entityNames"])
-                return [types.TextContent(
-                    type="text",
-                    text="Entities deleted successfully"
-                )]
-                
-            elif name == "delete_observations":
-                await graph_manager.delete_observations(arguments["deletions"])
-                return [types.TextContent(
-                    type="text",
-                    text="Observations deleted successfully"
-                )]
-                
-            elif name == "delete_relations":
-                relations = [Relation(**r) for r in arguments["relations"]]
-                await graph_manager.delete_relations(relations)
-                return [types.TextContent(
-                    type="text",
-                    text="Relations deleted successfully"
-                )]
-                
-            elif name == "search_nodes":
-                result = await graph_manager.search_nodes(arguments["query"])
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "entities": [vars(e) for e in result.entities],
-                        "relations": [vars(r) for r in result.relations]
-                    }, indent=2, ensure_ascii=False)
-                )]
-                
-            elif name == "open_nodes":
-                result = await graph_manager.open_nodes(arguments["names"])
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "entities": [vars(e) for e in result.entities],
-                        "relations": [vars(r) for r in result.relations]
-                    }, indent=2, ensure_ascii=False)
-                )]
-            
-            else:
+            handler = tool_handlers.get(name)
+            if handler is None:
                 raise ValueError(f"Unknown tool: {name}")
+
+            # 分发前按工具定义检查必填参数
+            required = TOOL_REQUIRED_ARGS[name]
+            if required and not arguments:
+                raise ValueError("Missing arguments")
+            missing = [key for key in required if key not in arguments]
+            if missing:
+                raise ValueError(f"Missing arguments: {', '.join(missing)}")
+
+            # 默认输出紧凑 JSON，仅在调试时按需缩进
+            pretty = bool(arguments.get("pretty", False)) if arguments else False
+            return [types.TextContent(
+                type="text",
+                text=await handler(arguments or {}, pretty)
+            )]
             
         except Exception as e:
-            print(f"Error in tool {name}: {str(e)}")
+            # stdio 模式下 stdout 是协议通道，错误只写入日志
+            logger.error(f"Error in tool {name}: {str(e)}")
             return [types.TextContent(type="text", text=f"Error: {str(e)}")]
     return app
 
-async def main_sse(app, port: int = 8080):
+async def main_sse(app, port: int = 8080, allowed_origins: list | None = None):
     
     # 设置 SSE 服务器
     sse = SseServerTransport("/messages/")
@@ -905,7 +1334,8 @@ async def main_sse(app, port: int = 8080):
     middleware = [
         Middleware(
             CORSMiddleware,
-            allow_origins=["*"],  # 允许所有来源，生产环境建议设置具体域名
+            # 默认允许所有来源，生产环境可在 config.json 的 allowed_origins 中设置具体域名
+            allow_origins=allowed_origins or ["*"],
             allow_credentials=True,
             allow_methods=["*"],  # 允许所有方法
             allow_headers=["*"],  # 允许所有请求头
@@ -926,13 +1356,13 @@ async def main_sse(app, port: int = 8080):
     import socket
 
     def get_local_ip():
+        # UDP 套接字 connect 只让内核选择出口地址，不发送数据也不做 DNS 解析，
+        # 避免主机名解析配置错误时启动卡住
         try:
-            # 获取本机主机名
-            hostname = socket.gethostname()
-            # 获取本机IP地址
-            ip = socket.gethostbyname(hostname)
-            return ip
-        except:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(("8.8.8.8", 80))
+                return s.getsockname()[0]
+        except OSError:
             return "127.0.0.1"
 
     local_ip = get_local_ip()
@@ -945,11 +1375,28 @@ async def main_sse(app, port: int = 8080):
         starlette_app, 
         host="0.0.0.0", 
         port=port,
-        log_level="warning"  # 减少不必要的日志输出
+        log_level="warning",  # 减少不必要的日志输出
+        timeout_keep_alive=75  # 客户端的多次工具调用复用同一连接
     )
     server = uvicorn.Server(config)
     await server.serve()
 
+def run_async(coro):
+    """运行协程，安装了 uvloop 时使用 uvloop 事件循环"""
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
+
+def stdin_has_data(timeout: float = STDIN_WAIT) -> bool:
+    """stdin 为管道或文件且在超时内可读时返回 True，
+    避免父进程保持管道打开却不写入时 read() 一直阻塞启动"""
+    if sys.stdin is None or sys.stdin.isatty():
+        return False
+    if sys.platform.startswith("win"):
+        return True  # Windows 上 select 不支持管道，保持原来的行为
+    readable, _, _ = select.select([sys.stdin], [], [], timeout)
+    return bool(readable)
+
 def get_user_input(prompt: str, default: str) -> str:
     """获取用户输入，如果用户直接回车则使用默认值"""
     try:
@@ -962,18 +1409,9 @@ def get_user_input(prompt: str, default: str) -> str:
         print(f"输入处理错误: {e}")
         return default
 
-def get_config_path() -> Path:
-    """获取配置文件路径"""
-    if getattr(sys, 'frozen', False):
-        # 如果是打包后的exe运行
-        return Path(sys.executable).parent / "config.json"
-    else:
-        # 如果是源代码运行
-        return Path(__file__).parent / "config.json"
-
 def load_config() -> dict:
     """加载配置文件"""
-    config_path = get_config_path()
+    config_path = CONFIG_PATH
     if config_path.exists():
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
@@ -984,17 +1422,285 @@ def load_config() -> dict:
 
 def save_config(port: int, memory_path: str):
     """保存配置到文件"""
-    config_path = get_config_path()
-    config = {
+    config_path = CONFIG_PATH
+    # 保留配置文件中的其他字段（如 allowed_origins）
+    config = load_config()
+    config.update({
         'port': port,
         'memory_path': str(memory_path)
-    }
+    })
     try:
         with open(config_path, 'w', encoding='utf-8') as f:
             json.dump(config, f, ensure_ascii=False, indent=2)
     except Exception as e:
         print(f"保存配置文件失败: {e}")
 
+# stdin help 请求的返回内容是固定的，在导入时构建一次
+HELP_RESULT = {
+    "type": "mcp",
+    "description": "此服务是提供memory相关的mcp服务",
+    "author": "shadow@Mixlab",
+    "version": MEMORY_VERSION,
+    "github": "https://github.com/shadowcz007/memory_mcp",
+    "transport": ["stdio", "sse"],
+    "methods": [
+        {
+            "name": "help",
+            "description": "显示此帮助信息。"
+        },
+        {
+            "name": "start",
+            "description": "启动服务器",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "transport": {
+                        "type": "string",
+                        "enum": ["stdio", "sse"],
+                        "description": "传输类型",
+                        "default": "sse"
+                    },
+                    "port": {
+                        "type": "integer",
+                        "description": "服务器端口号 (仅在 transport=sse 时需要设置)",
+                        "default": 8080
+                    },
+                    "memory_path": {
+                        "type": "string",
+                        "description": "内存文件路径",
+                        "default": "./memory.json"
+                    }
+                }
+            }
+        },
+        {
+            "name": "tools_list",
+            "description": "列出所有可用工具"
+        },
+        {
+            "name": "tools_call",
+            "description": "调用工具",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "工具名称"
+                    },
+                    "arguments": {
+                        "type": "object",
+                        "description": "工具参数"
+                    }
+                },
+                "required": ["name"]
+            }
+        },
+        {
+            "name": "create_entities",
+            "description": "创建多个新实体到知识图谱中",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "entities": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "name": {"type": "string"},
+                                "entityType": {"type": "string"},
+                                "observations": {
+                                    "type": "array",
+                                    "items": {"type": "string"}
+                                }
+                            },
+                            "required": ["name", "entityType", "observations"]
+                        }
+                    }
+                },
+                "required": ["entities"]
+            }
+        },
+        {
+            "name": "create_relations",
+            "description": "创建多个实体间的关系到知识图谱中",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "relations": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "from_": {"type": "string"},
+                                "to": {"type": "string"},
+                                "relationType": {"type": "string"}
+                            },
+                            "required": ["from_", "to", "relationType"]
+                        }
+                    }
+                },
+                "required": ["relations"]
+            }
+        },
+        {
+            "name": "add_observations",
+            "description": "为已存在的实体添加新的观察",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "observations": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "entityName": {"type": "string"},
+                                "contents": {
+                                    "type": "array",
+                                    "items": {"type": "string"}
+                                }
+                            },
+                            "required": ["entityName", "contents"]
+                        }
+                    }
+                },
+                "required": ["observations"]
+            }
+        },
+        {
+            "name": "delete_entities",
+            "description": "删除多个实体及其关系",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "entityNames": {
+                        "type": "array",
+                        "items": {"type": "string"}
+                    }
+                },
+                "required": ["entityNames"]
+            }
+        },
+        {
+            "name": "delete_observations",
+            "description": "从实体中删除特定观察",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "deletions": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "entityName": {"type": "string"},
+                                "observations": {
+                                    "type": "array",
+                                    "items": {"type": "string"}
+                                }
+                            },
+                            "required": ["entityName", "observations"]
+                        }
+                    }
+                },
+                "required": ["deletions"]
+            }
+        },
+        {
+            "name": "delete_relations",
+            "description": "从图谱中删除多个关系",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "relations": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "from_": {"type": "string"},
+                                "to": {"type": "string"},
+                                "relationType": {"type": "string"}
+                            },
+                            "required": ["from_", "to", "relationType"]
+                        }
+                    }
+                },
+                "required": ["relations"]
+            }
+        },
+        {
+            "name": "read_graph",
+            "description": "读取整个知识图谱",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "pretty": {"type": "boolean"}
+                }
+            }
+        },
+        {
+            "name": "search_nodes",
+            "description": "在图谱中搜索节点",
+            "inputSchema": {
+                "type": "object", 
+                "properties": {
+                    "query": {"type": "string"},
+                    "pretty": {"type": "boolean"}
+                },
+                "required": ["query"]
+            }
+        },
+        {
+            "name": "open_nodes",
+            "description": "通过名称打开特定节点",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "names": {
+                        "type": "array",
+                        "items": {"type": "string"}
+                    },
+                    "pretty": {"type": "boolean"}
+                },
+                "required": ["names"]
+            }
+        },
+        {
+            "name": "prompts_list",
+            "description": "列出所有可用的提示模板"
+        },
+        {
+            "name": "prompts_get",
+            "description": "获取特定提示模板",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "arguments": {"type": "object"}
+                },
+                "required": ["name"]
+            }
+        },
+        {
+            "name": "resources_list",
+            "description": "列出所有可用资源"
+        },
+        {
+            "name": "resources_templates_list",
+            "description": "列出所有资源模板"
+        },
+        {
+            "name": "resources_read",
+            "description": "读取特定资源",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "uri": {"type": "string"}
+                },
+                "required": ["uri"]
+            }
+        }
+    ]
+}
+
 if __name__ == "__main__":
     import asyncio
     import argparse
@@ -1012,10 +1718,7 @@ if __name__ == "__main__":
         from mcp.server.stdio import stdio_server
         async def run_stdio():
 
-            if getattr(sys, 'frozen', False):
-                memory_path = Path(sys.executable).parent / "memory.json"
-            else:
-                memory_path = Path(__file__).parent / "memory.json"
+            memory_path = BASE_DIR / "memory.json"
         
             app=init_server(str(memory_path))
             async with stdio_server() as (read_stream, write_stream):
@@ -1025,7 +1728,7 @@ if __name__ == "__main__":
                     app.create_initialization_options()
                 )
                 
-        asyncio.run(run_stdio())
+        run_async(run_stdio())
         sys.exit(0)
     
     # 加载上次的配置
@@ -1036,12 +1739,12 @@ if __name__ == "__main__":
     # 1. 首先检查是否有 stdin 输入
     try:
         # 检查stdin是否有数据可读
-        if not sys.stdin.isatty():  # 如果stdin不是终端，说明可能有管道输入
+        if stdin_has_data():  # 管道或文件输入，且在等待时间内有数据（或已到 EOF）
             json_str = sys.stdin.read().strip()
             if json_str:  # 确保输入不为空
                 if json_str.startswith('\ufeff'):
                     json_str = json_str[1:]
-                stdin_config = json.loads(json_str)
+                stdin_config = json_loads(json_str)
                 
                 # 检查是否是帮助请求
                 if (stdin_config.get("jsonrpc") == "2.0" and 
@@ -1050,269 +1753,10 @@ if __name__ == "__main__":
                     
                     help_response = {
                         "jsonrpc": "2.0",
-                        "result": {
-                            "type": "mcp",
-                            "description": "此服务是提供memory相关的mcp服务",
-                            "author": "shadow@Mixlab",
-                            "version": MEMORY_VERSION,
-                            "github": "https://github.com/shadowcz007/memory_mcp",
-                            "transport": ["stdio", "sse"],
-                            "methods": [
-                                {
-                                    "name": "help",
-                                    "description": "显示此帮助信息。"
-                                },
-                                {
-                                    "name": "start",
-                                    "description": "启动服务器",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "transport": {
-                                                "type": "string",
-                                                "enum": ["stdio", "sse"],
-                                                "description": "传输类型",
-                                                "default": "sse"
-                                            },
-                                            "port": {
-                                                "type": "integer",
-                                                "description": "服务器端口号 (仅在 transport=sse 时需要设置)",
-                                                "default": 8080
-                                            },
-                                            "memory_path": {
-                                                "type": "string",
-                                                "description": "内存文件路径",
-                                                "default": "./memory.json"
-                                            }
-                                        }
-                                    }
-                                },
-                                {
-                                    "name": "tools_list",
-                                    "description": "列出所有可用工具"
-                                },
-                                {
-                                    "name": "tools_call",
-                                    "description": "调用工具",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "name": {
-                                                "type": "string",
-                                                "description": "工具名称"
-                                            },
-                                            "arguments": {
-                                                "type": "object",
-                                                "description": "工具参数"
-                                            }
-                                        },
-                                        "required": ["name"]
-                                    }
-                                },
-                                {
-                                    "name": "create_entities",
-                                    "description": "创建多个新实体到知识图谱中",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "entities": {
-                                                "type": "array",
-                                                "items": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "name": {"type": "string"},
-                                                        "entityType": {"type": "string"},
-                                                        "observations": {
-                                                            "type": "array",
-                                                            "items": {"type": "string"}
-                                                        }
-                                                    },
-                                                    "required": ["name", "entityType", "observations"]
-                                                }
-                                            }
-                                        },
-                                        "required": ["entities"]
-                                    }
-                                },
-                                {
-                                    "name": "create_relations",
-                                    "description": "创建多个实体间的关系到知识图谱中",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "relations": {
-                                                "type": "array",
-                                                "items": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "from_": {"type": "string"},
-                                                        "to": {"type": "string"},
-                                                        "relationType": {"type": "string"}
-                                                    },
-                                                    "required": ["from_", "to", "relationType"]
-                                                }
-                                            }
-                                        },
-                                        "required": ["relations"]
-                                    }
-                                },
-                                {
-                                    "name": "add_observations",
-                                    "description": "为已存在的实体添加新的观察",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "observations": {
-                                                "type": "array",
-                                                "items": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "entityName": {"type": "string"},
-                                                        "contents": {
-                                                            "type": "array",
-                                                            "items": {"type": "string"}
-                                                        }
-                                                    },
-                                                    "required": ["entityName", "contents"]
-                                                }
-                                            }
-                                        },
-                                        "required": ["observations"]
-                                    }
-                                },
-                                {
-                                    "name": "delete_entities",
-                                    "description": "删除多个实体及其关系",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "entityNames": {
-                                                "type": "array",
-                                                "items": {"type": "string"}
-                                            }
-                                        },
-                                        "required": ["entityNames"]
-                                    }
-                                },
-                                {
-                                    "name": "delete_observations",
-                                    "description": "从实体中删除特定观察",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "deletions": {
-                                                "type": "array",
-                                                "items": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "entityName": {"type": "string"},
-                                                        "observations": {
-                                                            "type": "array",
-                                                            "items": {"type": "string"}
-                                                        }
-                                                    },
-                                                    "required": ["entityName", "observations"]
-                                                }
-                                            }
-                                        },
-                                        "required": ["deletions"]
-                                    }
-                                },
-                                {
-                                    "name": "delete_relations",
-                                    "description": "从图谱中删除多个关系",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "relations": {
-                                                "type": "array",
-                                                "items": {
-                                                    "type": "object",
-                                                    "properties": {
-                                                        "from_": {"type": "string"},
-                                                        "to": {"type": "string"},
-                                                        "relationType": {"type": "string"}
-                                                    },
-                                                    "required": ["from_", "to", "relationType"]
-                                                }
-                                            }
-                                        },
-                                        "required": ["relations"]
-                                    }
-                                },
-                                {
-                                    "name": "read_graph",
-                                    "description": "读取整个知识图谱",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {}
-                                    }
-                                },
-                                {
-                                    "name": "search_nodes",
-                                    "description": "在图谱中搜索节点",
-                                    "inputSchema": {
-                                        "type": "object", 
-                                        "properties": {
-                                            "query": {"type": "string"}
-                                        },
-                                        "required": ["query"]
-                                    }
-                                },
-                                {
-                                    "name": "open_nodes",
-                                    "description": "通过名称打开特定节点",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "names": {
-                                                "type": "array",
-                                                "items": {"type": "string"}
-                                            }
-                                        },
-                                        "required": ["names"]
-                                    }
-                                },
-                                {
-                                    "name": "prompts_list",
-                                    "description": "列出所有可用的提示模板"
-                                },
-                                {
-                                    "name": "prompts_get",
-                                    "description": "获取特定提示模板",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "name": {"type": "string"},
-                                            "arguments": {"type": "object"}
-                                        },
-                                        "required": ["name"]
-                                    }
-                                },
-                                {
-                                    "name": "resources_list",
-                                    "description": "列出所有可用资源"
-                                },
-                                {
-                                    "name": "resources_templates_list",
-                                    "description": "列出所有资源模板"
-                                },
-                                {
-                                    "name": "resources_read",
-                                    "description": "读取特定资源",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "uri": {"type": "string"}
-                                        },
-                                        "required": ["uri"]
-                                    }
-                                }
-                            ]
-                        },
+                        "result": HELP_RESULT,
                         "id": stdin_config["id"]
                     }
-                    print(json.dumps(help_response, ensure_ascii=False, indent=2))
+                    print(json_dumps(help_response, indent=True))
                     sys.exit(0)  # 退出程序，因为已经处理了请求
 
                 # 新增处理 start 方法
@@ -1362,10 +1806,7 @@ if __name__ == "__main__":
         memory_path = args.memory_path
         
     if memory_path is None:
-        if getattr(sys, 'frozen', False):
-            default_memory_path = Path(sys.executable).parent / "memory.json"
-        else:
-            default_memory_path = Path(__file__).parent / "memory.json"
+        default_memory_path = BASE_DIR / "memory.json"
             
         saved_memory_path = last_config.get('memory_path')
         default_path = saved_memory_path if saved_memory_path else str(default_memory_path)
@@ -1378,10 +1819,7 @@ if __name__ == "__main__":
     # 处理内存文件路径
     memory_path = Path(memory_path)
     if not memory_path.is_absolute():
-        if getattr(sys, 'frozen', False):
-            memory_path = Path(sys.executable).parent / memory_path
-        else:
-            memory_path = Path(__file__).parent / memory_path
+        memory_path = BASE_DIR / memory_path
     
     print(f"Memory file will be stored at: {memory_path.resolve()}")
     
@@ -1417,5 +1855,5 @@ if __name__ == "__main__":
     
     if transport == "sse":
         app=init_server(str(memory_path))
-        asyncio.run(main_sse(app, port))
+        run_async(main_sse(app, port, last_config.get("allowed_origins")))
     